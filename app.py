@@ -1,13 +1,18 @@
 import base64
 import posixpath
 import datetime
+import heapq
+import math
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Tuple, Union
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # -----------------------------
@@ -37,10 +42,45 @@ if not GITHUB_TOKEN or not REPO:
     st.stop()
 
 API = "https://api.github.com"
-HEADERS = {
-    "Authorization": f"Bearer {GITHUB_TOKEN}",  # IMPORTANT for modern PATs
-    "Accept": "application/vnd.github+json",
-}
+
+
+# One pooled keep-alive session so TLS is negotiated once and reused across calls.
+# Idempotent requests are retried on transient 5xx responses.
+# Cached as a resource so it survives Streamlit reruns; the token is part of the
+# cache key, so a rotated secret gets a fresh session. No spinner: this runs before
+# st.set_page_config, which must be the first command to send anything to the page.
+@st.cache_resource(show_spinner=False)
+def _github_session(token: str) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Authorization": f"Bearer {token}",  # IMPORTANT for modern PATs
+            "Accept": "application/vnd.github+json",
+        }
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            ),
+        ),
+    )
+    return session
+
+
+_SESSION = _github_session(GITHUB_TOKEN)
+
+
+# Shared across reruns for work kicked off ahead of a button press
+@st.cache_resource(show_spinner=False)
+def _background_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2)
 
 
 # -----------------------------
@@ -53,8 +93,13 @@ class GHFile:
     content: str  # decoded text
 
 
+@dataclass
+class EncodedBlob:
+    content_b64: bytes  # binary content, already base64-encoded (ASCII bytes)
+
+
 def gh_request(method: str, url: str, **kwargs):
-    r = requests.request(method, url, headers=HEADERS, timeout=30, **kwargs)
+    r = _SESSION.request(method, url, timeout=30, **kwargs)
     if r.status_code >= 400:
         try:
             msg = r.json()
@@ -64,81 +109,160 @@ def gh_request(method: str, url: str, **kwargs):
     return r
 
 
+@st.cache_resource(show_spinner=False)
+def _etag_store() -> dict:
+    # url -> (etag, json); the token is app-wide, so entries can be shared by all sessions
+    return {}
+
+
+# Resolved on the script thread; worker threads only touch the plain dict
+_ETAGS = _etag_store()
+
+
+def gh_get_json(url: str):
+    """
+    Conditional GET: sends If-None-Match with the last ETag seen for this URL.
+    GitHub answers 304 (no rate-limit cost, empty body) when nothing changed,
+    in which case the previously returned JSON is reused.
+    Takes no params/headers, so the URL alone identifies the cached response.
+    """
+    cached = _ETAGS.get(url)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    r = gh_request("GET", url, headers=headers)
+    if r.status_code == 304 and cached:
+        return cached[1]
+    j = r.json()
+    etag = r.headers.get("ETag")
+    if etag:
+        _ETAGS[url] = (etag, j)
+    return j
+
+
 def normalize_docs_path(p: str) -> str:
     # Keep posix paths for GitHub.
     p = p.replace("\\", "/").strip("/")
     return p
 
 
-def is_under(parent: str, child: str) -> bool:
-    parent = parent.rstrip("/") + "/"
-    return child.startswith(parent)
+@st.cache_data(ttl=30, show_spinner=False)
+def head_sha(branch: str, epoch: int = 0) -> str:
+    """
+    Resolves the commit SHA a branch currently points at.
+    `epoch` is only a cache key; bump it to force a fresh lookup.
+    """
+    ref = gh_get_json(f"{API}/repos/{REPO}/git/ref/heads/{branch}")
+    return ref["object"]["sha"]
 
 
-def list_tree_recursive(branch: str) -> List[dict]:
+@st.cache_data(ttl=3600, show_spinner=False)
+def tree_for_sha(sha: str) -> dict:
+    """
+    Fetches the recursive Git Trees API response for a commit SHA
+    (root tree "sha" plus the "tree" entries).
+    Trees are immutable per commit, so this can stay cached for a long time.
+    """
+    return gh_request("GET", f"{API}/repos/{REPO}/git/trees/{sha}?recursive=1").json()
+
+
+def list_tree_recursive(branch: str, epoch: int = 0) -> Tuple[str, List[dict]]:
     """
     Uses Git Trees API to list the repo tree recursively for a given branch.
+    Returns (commit sha the tree was read from, tree entries).
+    """
+    sha = head_sha(branch, epoch)
+    return sha, tree_for_sha(sha).get("tree", [])
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def read_file_cached(path: str, sha: str) -> str:
+    """
+    Fetches a blob's decoded text by sha. Blobs are immutable, so the
+    (path, sha) key never goes stale and reruns don't re-download the page.
     """
-    ref_url = f"{API}/repos/{REPO}/git/ref/heads/{branch}"
-    ref = gh_request("GET", ref_url).json()
-    commit_sha = ref["object"]["sha"]
+    r = gh_request(
+        "GET",
+        f"{API}/repos/{REPO}/git/blobs/{sha}",
+        headers={"Accept": "application/vnd.github.raw"},
+    )
+    return r.content.decode("utf-8", errors="replace")
 
-    commit_url = f"{API}/repos/{REPO}/git/commits/{commit_sha}"
-    commit = gh_request("GET", commit_url).json()
-    tree_sha = commit["tree"]["sha"]
 
-    tree_url = f"{API}/repos/{REPO}/git/trees/{tree_sha}?recursive=1"
-    tree = gh_request("GET", tree_url).json()
-    return tree.get("tree", [])
+def encode_bytes(data: bytes) -> bytes:
+    return base64.b64encode(data)
 
 
-def read_file(path: str, branch: str) -> GHFile:
-    url = f"{API}/repos/{REPO}/contents/{path}"
-    j = gh_request("GET", url, params={"ref": branch}).json()
-    if j.get("type") != "file":
-        raise RuntimeError(f"Path is not a file: {path}")
-    raw = base64.b64decode(j["content"]).decode("utf-8", errors="replace")
-    return GHFile(path=path, sha=j["sha"], content=raw)
+def create_blob(data: Union[bytes, EncodedBlob]) -> str:
+    url = f"{API}/repos/{REPO}/git/blobs"
+    content_b64 = data.content_b64 if isinstance(data, EncodedBlob) else encode_bytes(data)
+    # Base64 needs no JSON escaping, so build the body from bytes directly instead of
+    # decoding to str and letting json= re-serialize and re-encode a large payload.
+    payload = b"".join((b'{"encoding": "base64", "content": "', content_b64, b'"}'))
+    headers = {"Content-Type": "application/json"}
+    return gh_request("POST", url, data=payload, headers=headers).json()["sha"]
 
 
-def upsert_file(
-    path: str,
-    content_text: str,
+def commit_tree(
+    base_sha: str,
+    changes: List[Tuple[str, Union[str, bytes, EncodedBlob, None]]],
     message: str,
-    branch: str,
-    sha: Optional[str] = None,
-):
-    url = f"{API}/repos/{REPO}/contents/{path}"
-    payload = {
-        "message": message,
-        "content": base64.b64encode(content_text.encode("utf-8")).decode("utf-8"),
-        "branch": branch,
-        "committer": {"name": COMMITTER_NAME, "email": COMMITTER_EMAIL},
-    }
-    if sha:
-        payload["sha"] = sha
-    gh_request("PUT", url, json=payload).json()
-
-
-def delete_file(path: str, sha: str, message: str, branch: str):
-    url = f"{API}/repos/{REPO}/contents/{path}"
-    payload = {
-        "message": message,
-        "sha": sha,
-        "branch": branch,
-        "committer": {"name": COMMITTER_NAME, "email": COMMITTER_EMAIL},
+) -> str:
+    """
+    Writes all changes as a single commit on top of base_sha using the Git Data API.
+    Each change is (path, content):
+    - str: text file, sent inline with the tree (no separate blob call)
+    - bytes / EncodedBlob: binary file, uploaded as a blob first
+      (blobs are created in parallel)
+    - None: delete the file
+    Returns the new commit SHA. No ref is updated.
+    """
+    binary = [(path, data) for path, data in changes if isinstance(data, (bytes, EncodedBlob))]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(binary), 8))) as ex:
+        futures = {path: ex.submit(create_blob, data) for path, data in binary}
+    blob_shas = {path: fut.result() for path, fut in futures.items()}
+
+    base = tree_for_sha(base_sha)
+    # Keep the existing mode (e.g. executable, symlink) when overwriting a file
+    changed = {path for path, _ in changes}
+    base_modes = {
+        item["path"]: item["mode"] for item in base.get("tree", []) if item.get("path") in changed
     }
-    gh_request("DELETE", url, json=payload).json()
+
+    entries = []
+    for path, data in changes:
+        entry = {"path": path, "mode": base_modes.get(path, "100644"), "type": "blob"}
+        if data is None:
+            entry["sha"] = None
+        elif path in blob_shas:
+            entry["sha"] = blob_shas[path]
+        else:
+            entry["content"] = data
+        entries.append(entry)
+
+    tree = gh_request(
+        "POST",
+        f"{API}/repos/{REPO}/git/trees",
+        json={"base_tree": base["sha"], "tree": entries},
+    ).json()
+
+    who = {"name": COMMITTER_NAME, "email": COMMITTER_EMAIL}
+    commit = gh_request(
+        "POST",
+        f"{API}/repos/{REPO}/git/commits",
+        json={
+            "message": message,
+            "tree": tree["sha"],
+            "parents": [base_sha],
+            "author": who,
+            "committer": who,
+        },
+    ).json()
+    return commit["sha"]
 
 
 # -----------------------------
 # PR workflow helpers
 # -----------------------------
-def create_branch_from_base(base_branch: str) -> str:
-    # get base branch SHA
-    ref = gh_request("GET", f"{API}/repos/{REPO}/git/ref/heads/{base_branch}").json()
-    base_sha = ref["object"]["sha"]
-
+def create_branch_at(commit_sha: str) -> str:
     suffix = datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
     rand = "".join(random.choices(string.ascii_lowercase + string.digits, k=4))
     new_branch = f"docs-edit-{suffix}-{rand}"
@@ -146,7 +270,7 @@ def create_branch_from_base(base_branch: str) -> str:
     gh_request(
         "POST",
         f"{API}/repos/{REPO}/git/refs",
-        json={"ref": f"refs/heads/{new_branch}", "sha": base_sha},
+        json={"ref": f"refs/heads/{new_branch}", "sha": commit_sha},
     )
     return new_branch
 
@@ -165,17 +289,19 @@ def open_pr_for_change(
     title: str,
     body: str,
     commit_message: str,
-    file_ops_fn,
+    base_sha: str,
+    changes: List[Tuple[str, Union[str, bytes, EncodedBlob, None]]],
 ) -> str:
     """
     Generic helper:
-    - create a new branch from BASE_BRANCH
-    - run file_ops_fn(branch_name) which commits one or more changes to that branch
+    - commit all changes on top of base_sha (a BASE_BRANCH commit) in one commit
+      (see commit_tree)
+    - create a new branch pointing at that commit
     - open a PR back to BASE_BRANCH
     Returns PR URL.
     """
-    new_branch = create_branch_from_base(BASE_BRANCH)
-    file_ops_fn(new_branch)
+    new_commit = commit_tree(base_sha, changes, commit_message)
+    new_branch = create_branch_at(new_commit)
     pr_url = create_pull_request(
         head_branch=new_branch,
         base_branch=BASE_BRANCH,
@@ -193,23 +319,41 @@ st.title("Hypatos Documentation Editor")
 st.caption(f"Repo: `{REPO}` · Base branch: `{BASE_BRANCH}`")
 
 
-@st.cache_data(ttl=30)
-def cached_tree(branch: str):
-    return list_tree_recursive(branch)
-
-
 # ------------------------------------------------
 # 🔎 GitHub connection test
 # ------------------------------------------------
+def _check_auth() -> dict:
+    return gh_get_json(f"{API}/user")
+
+
+def _check_repo() -> dict:
+    return gh_get_json(f"{API}/repos/{REPO}")
+
+
+def _check_ref(branch: str) -> dict:
+    return gh_get_json(f"{API}/repos/{REPO}/git/ref/heads/{branch}")
+
+
+# Cached so the checks don't re-run on every widget interaction.
+# Only a cache miss spins up the pool; hits are served on the script thread.
+@st.cache_data(ttl=300, show_spinner=False)
+def _connection_checks(branch: str) -> Tuple[dict, dict, dict]:
+    # The three checks are independent, so issue them concurrently.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        f_me = ex.submit(_check_auth)
+        f_repo = ex.submit(_check_repo)
+        f_ref = ex.submit(_check_ref, branch)
+    return f_me.result(), f_repo.result(), f_ref.result()
+
+
 with st.expander("🔎 GitHub connection test", expanded=False):
+    if st.button("🔄 Re-run checks"):
+        _connection_checks.clear()
+
     try:
-        me = gh_request("GET", f"{API}/user").json()
+        me, repo_info, ref = _connection_checks(BASE_BRANCH)
         st.success(f"Authenticated as: {me.get('login')}")
-
-        repo_info = gh_request("GET", f"{API}/repos/{REPO}").json()
         st.success(f"Repo access OK: {repo_info.get('full_name')}")
-
-        ref = gh_request("GET", f"{API}/repos/{REPO}/git/ref/heads/{BASE_BRANCH}").json()
         st.success(f"Base branch OK: {BASE_BRANCH}")
 
     except Exception as e:
@@ -218,30 +362,36 @@ with st.expander("🔎 GitHub connection test", expanded=False):
 # ------------------------------------------------
 
 
-tree = cached_tree(BASE_BRANCH)
+# Bumped after each commit so only the branch head lookup is refreshed;
+# sha-keyed caches (tree, file contents) and the connection checks stay warm.
+st.session_state.setdefault("tree_epoch", 0)
+# base_sha is the commit this run's tree, blob shas and existence checks come from;
+# PRs are committed on top of it so they never land on a head the user didn't see.
+base_sha, tree = list_tree_recursive(BASE_BRANCH, st.session_state.tree_epoch)
 
-# Collect markdown pages under docs root
 docs_root = normalize_docs_path(DOCS_ROOT)
-md_files = sorted(
-    [
-        item["path"]
-        for item in tree
-        if item.get("type") == "blob"
-        and item.get("path", "").endswith(".md")
-        and is_under(docs_root, item["path"])
-    ]
-)
-
-# Assets directory listing (optional)
 assets_root = normalize_docs_path(ASSETS_DIR)
-asset_files = sorted(
-    [
-        item["path"]
-        for item in tree
-        if item.get("type") == "blob"
-        and is_under(assets_root, item["path"])
-    ]
-)
+docs_prefix = docs_root.rstrip("/") + "/"
+assets_prefix = assets_root.rstrip("/") + "/"
+
+# Single pass over the tree:
+# - blob path -> sha on base, so existence checks and reads need no extra GET
+# - markdown pages under docs root
+# - assets directory listing (optional)
+path_to_sha = {}
+md_files, asset_files = [], []
+for item in tree:
+    if item.get("type") != "blob":
+        continue
+    path = item.get("path", "")
+    path_to_sha[path] = item["sha"]
+    if path.endswith(".md") and path.startswith(docs_prefix):
+        md_files.append(path)
+    if path.startswith(assets_prefix):
+        asset_files.append(path)
+md_files.sort()
+# asset_files stays in tree order; the sidebar only shows one page of it
+ASSET_PAGE_SIZE = 30
 
 with st.sidebar:
     st.header("Pages")
@@ -262,8 +412,23 @@ with st.sidebar:
 
     if action == "Upload asset":
         st.write(f"Uploads to: `{ASSETS_DIR}`")
-        st.write("Existing assets:")
-        st.code("\n".join(asset_files[:30]) + ("\n..." if len(asset_files) > 30 else ""))
+        st.write(f"Existing assets ({len(asset_files)}):")
+        n_pages = max(1, math.ceil(len(asset_files) / ASSET_PAGE_SIZE))
+        page = 0
+        if n_pages > 1:
+            page = st.selectbox(
+                "Asset page", range(n_pages), format_func=lambda i: f"{i + 1} / {n_pages}"
+            )
+        sorted_view = st.checkbox("Sorted view", value=False)
+
+        start = page * ASSET_PAGE_SIZE
+        end = start + ASSET_PAGE_SIZE
+        if sorted_view:
+            # Only the entries up to this page are ordered, not the whole list
+            page_assets = heapq.nsmallest(end, asset_files)[start:]
+        else:
+            page_assets = asset_files[start:end]
+        st.code("\n".join(page_assets))
 
     st.divider()
     st.header("Navigation (mkdocs.yml)")
@@ -271,7 +436,7 @@ with st.sidebar:
     st.write("After creating a page, add it under `nav:` in `mkdocs.yml`.")
 
 
-def two_col_editor(initial_text: str) -> Tuple[str, str]:
+def two_col_editor(initial_text: str, show_preview: bool = True) -> Tuple[str, str]:
     left, right = st.columns(2, gap="large")
     with left:
         st.subheader("Markdown")
@@ -283,51 +448,72 @@ def two_col_editor(initial_text: str) -> Tuple[str, str]:
         )
     with right:
         st.subheader("Preview")
-        st.markdown(edited)
+        if show_preview:
+            st.markdown(edited)
+        else:
+            st.caption("Preview hidden.")
     return edited, ""
 
 
+def drop_encoded_upload():
+    # Release the pre-encoded upload (about 1.33x the file size)
+    st.session_state.pop("encode_future", None)
+    st.session_state.pop("encoded_for", None)
+
+
 # -----------------------------
 # Actions
 # -----------------------------
+if action != "Upload asset":
+    drop_encoded_upload()
+
 if action == "Edit existing page":
     if not md_files:
         st.info("No Markdown files found under docs root.")
         st.stop()
 
     try:
-        f = read_file(selected, BASE_BRANCH)
+        sha = path_to_sha[selected]
+        f = GHFile(path=selected, sha=sha, content=read_file_cached(selected, sha))
     except Exception as e:
         st.error(str(e))
         st.stop()
 
     st.write(f"Editing: `{f.path}`")
 
-    new_text, _ = two_col_editor(f.content)
+    # Outside the form; toggling it keeps the editor (and unsubmitted edits) intact
+    show_preview = st.checkbox(
+        "Show preview",
+        value=True,
+        help="The preview updates when you click Refresh preview.",
+    )
+
+    # Inside a form, typing doesn't rerun the script (or re-render the preview);
+    # everything is sent on submit. Enter must never open a PR by accident.
+    with st.form("edit_form", enter_to_submit=False):
+        new_text, _ = two_col_editor(f.content, show_preview=show_preview)
 
-    col_a, col_b, col_c = st.columns([2, 2, 6])
-    with col_a:
-        commit_msg = st.text_input("Commit message", value=f"Update {f.path}")
-    with col_b:
-        do_commit = st.button("✅ Create PR", type="primary")
+        col_a, col_b, col_c = st.columns([2, 2, 6])
+        with col_a:
+            commit_msg = st.text_input("Commit message", value=f"Update {f.path}")
+        with col_b:
+            do_commit = st.form_submit_button("✅ Create PR", type="primary")
+        with col_c:
+            st.form_submit_button("🔄 Refresh preview")
 
     if do_commit:
         try:
-            def ops(branch_name: str):
-                # Read file SHA from base branch, then update on new branch using that SHA
-                base_file = read_file(f.path, BASE_BRANCH)
-                upsert_file(f.path, new_text, commit_msg, branch=branch_name, sha=base_file.sha)
-
             pr_url = open_pr_for_change(
                 title=f"{PR_TITLE_PREFIX}: Update {f.path}",
                 body="Created via Streamlit Docs Editor (protected branch → PR).",
                 commit_message=commit_msg,
-                file_ops_fn=ops,
+                base_sha=base_sha,
+                changes=[(f.path, new_text)],
             )
             st.success("Pull request created.")
             if pr_url:
                 st.markdown(f"[Open PR]({pr_url})")
-            st.cache_data.clear()
+            st.session_state.tree_epoch += 1
         except Exception as e:
             st.error(str(e))
 
@@ -346,10 +532,12 @@ elif action == "Create new page":
         title = st.text_input("Page title", value="My New Page")
 
     default_body = f"# {title}\n\nWrite your content here.\n"
-    body = st.text_area("Content", value=default_body, height=500)
+    # Path/title stay outside so the default body still follows the title
+    with st.form("create_form", enter_to_submit=False):
+        body = st.text_area("Content", value=default_body, height=500)
 
-    commit_msg = st.text_input("Commit message", value="Add new documentation page")
-    create_btn = st.button("➕ Create PR", type="primary")
+        commit_msg = st.text_input("Commit message", value="Add new documentation page")
+        create_btn = st.form_submit_button("➕ Create PR", type="primary")
 
     if create_btn:
         rel = normalize_docs_path(relative_path)
@@ -358,29 +546,24 @@ elif action == "Create new page":
             st.stop()
 
         full_path = normalize_docs_path(posixpath.join(DOCS_ROOT, rel))
-        try:
-            # Ensure it doesn't already exist on base
-            try:
-                _ = read_file(full_path, BASE_BRANCH)
-                st.error("A file already exists at that path.")
-                st.stop()
-            except Exception:
-                pass
-
-            def ops(branch_name: str):
-                upsert_file(full_path, body, commit_msg, branch=branch_name, sha=None)
+        # Ensure it doesn't already exist on base
+        if full_path in path_to_sha:
+            st.error("A file already exists at that path.")
+            st.stop()
 
+        try:
             pr_url = open_pr_for_change(
                 title=f"{PR_TITLE_PREFIX}: Add {full_path}",
                 body="Created via Streamlit Docs Editor (protected branch → PR).",
                 commit_message=commit_msg,
-                file_ops_fn=ops,
+                base_sha=base_sha,
+                changes=[(full_path, body)],
             )
             st.success("Pull request created.")
             if pr_url:
                 st.markdown(f"[Open PR]({pr_url})")
             st.info("Remember to add it to mkdocs.yml under nav:.")
-            st.cache_data.clear()
+            st.session_state.tree_epoch += 1
         except Exception as e:
             st.error(str(e))
 
@@ -392,6 +575,16 @@ elif action == "Upload asset":
         accept_multiple_files=False,
     )
 
+    # Start encoding as soon as the file arrives, so the payload is ready
+    # by the time the user has filled in the rest and clicks the button.
+    if uploaded is None:
+        drop_encoded_upload()
+    elif st.session_state.get("encoded_for") != uploaded.file_id:
+        st.session_state.encode_future = _background_executor().submit(
+            encode_bytes, uploaded.getvalue()
+        )
+        st.session_state.encoded_for = uploaded.file_id
+
     target_name = st.text_input(
         "Target filename",
         value=uploaded.name if uploaded else "my-asset.png",
@@ -404,44 +597,29 @@ elif action == "Upload asset":
     if upload_btn and uploaded is not None:
         try:
             target = normalize_docs_path(posixpath.join(ASSETS_DIR, target_name))
-            data = uploaded.getvalue()
-            content_b64 = base64.b64encode(data).decode("utf-8")
-
-            def ops(branch_name: str):
-                # check if exists on base to get sha (for overwrite)
-                sha = None
-                try:
-                    url = f"{API}/repos/{REPO}/contents/{target}"
-                    j = gh_request("GET", url, params={"ref": BASE_BRANCH}).json()
-                    if j.get("type") == "file":
-                        sha = j.get("sha")
-                except Exception:
-                    sha = None
-
-                url = f"{API}/repos/{REPO}/contents/{target}"
-                payload = {
-                    "message": commit_msg,
-                    "content": content_b64,
-                    "branch": branch_name,
-                    "committer": {"name": COMMITTER_NAME, "email": COMMITTER_EMAIL},
-                }
-                if sha:
-                    payload["sha"] = sha
-                gh_request("PUT", url, json=payload).json()
+            future = st.session_state.get("encode_future")
+            content_b64 = future.result() if future else encode_bytes(uploaded.getvalue())
 
+            # Binary content goes through a blob; an existing file is simply overwritten
             pr_url = open_pr_for_change(
                 title=f"{PR_TITLE_PREFIX}: Upload {target}",
                 body="Created via Streamlit Docs Editor (protected branch → PR).",
                 commit_message=commit_msg,
-                file_ops_fn=ops,
+                base_sha=base_sha,
+                changes=[(target, EncodedBlob(content_b64))],
             )
+            # Payload is no longer needed; keep encoded_for so this same upload
+            # isn't encoded again on the next rerun.
+            del content_b64
+            st.session_state.pop("encode_future", None)
+
             st.success("Pull request created.")
             if pr_url:
                 st.markdown(f"[Open PR]({pr_url})")
 
             st.caption("Use it in Markdown like:")
             st.code(f"![Alt text]({posixpath.relpath(target, DOCS_ROOT)})")
-            st.cache_data.clear()
+            st.session_state.tree_epoch += 1
         except Exception as e:
             st.error(str(e))
 
@@ -457,20 +635,16 @@ elif action == "Delete page":
 
         if st.button("🗑️ Create PR", type="primary", disabled=not confirm):
             try:
-                base_file = read_file(delete_target, BASE_BRANCH)
-
-                def ops(branch_name: str):
-                    delete_file(delete_target, base_file.sha, commit_msg, branch=branch_name)
-
                 pr_url = open_pr_for_change(
                     title=f"{PR_TITLE_PREFIX}: Delete {delete_target}",
                     body="Created via Streamlit Docs Editor (protected branch → PR).",
                     commit_message=commit_msg,
-                    file_ops_fn=ops,
+                    base_sha=base_sha,
+                    changes=[(delete_target, None)],
                 )
                 st.success("Pull request created.")
                 if pr_url:
                     st.markdown(f"[Open PR]({pr_url})")
-                st.cache_data.clear()
+                st.session_state.tree_epoch += 1
             except Exception as e:
                 st.error(str(e))